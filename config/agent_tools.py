@@ -6,6 +6,8 @@ available_functions_schema = types.Tool(
     function_declarations=[
         tools.get_files_info.schema_get_files_info,
         tools.get_file_content.schema_get_file_content,
+        tools.get_files_content.schema_get_files_content,
+        tools.get_code_outline.schema_get_code_outline,
         tools.write_file.schema_write_file,
         tools.run_python_file.schema_run_python_file,
         tools.get_current_temperature.schema_get_current_temperature
@@ -16,7 +18,12 @@ available_functions_schema = types.Tool(
 available_functions_dict = {
     "get_files_info": tools.get_files_info.get_files_info,
     "get_file_content": tools.get_file_content.get_file_content,
+    "get_files_content": tools.get_files_content.get_files_content,
+    "get_code_outline": tools.get_code_outline.get_code_outline,
     "write_file": tools.write_file.write_file,
     "run_python_file": tools.run_python_file.run_python_file,
     "get_current_temperature": tools.get_current_temperature.get_current_temperature
 }
+
+# Functions that read files and receive the agent's session state (seen file versions, prefetch cache)
+file_reading_functions = {"get_file_content", "get_files_content"}
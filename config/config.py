@@ -1,3 +1,17 @@
 MAX_FILE_CONTENT_LENGTH = 10000
+MAX_FILES_CONTENT_LENGTH = MAX_FILE_CONTENT_LENGTH * 3 # Shared character budget for a single batch read across all files
+MAX_FILES_PER_READ = 20
+AST_CACHE_SIZE = 128 # Parsed Python files kept in memory by get_code_outline
+OUTLINE_SKIPPED_DIRS = {"__pycache__", ".git", ".venv", "venv", "node_modules"} # Directories get_code_outline does not descend into
 MAX_ITERATIONS = 20
-WORKING_DIRECTORY = '[change this to the directory you want the agent to limit access to]' # Update this to your desired working directory this is important to limit file access of the agent.
\ No newline at end of file
+# Per-run budgets, a run ends with a "budget_exhausted" result once any of them is used up
+MAX_WALL_TIME_SECONDS = 300
+MAX_TOTAL_TOKENS = 500000 # Prompt and completion tokens summed over all model requests
+MAX_TOOL_TIME_SECONDS = 120 # Total time spent executing tool calls
+BUDGET_WARNING_RATIO = 0.8 # Fraction of any budget after which the model is asked to wrap up
+PREFETCH_ENABLED = False # Read small files from the latest directory listing in the background while the model is thinking
+PREFETCH_MAX_FILE_SIZE = MAX_FILE_CONTENT_LENGTH # Only files up to this many bytes are prefetched
+PREFETCH_MAX_FILES = 10 # Files prefetched per directory listing
+PREFETCH_CACHE_SIZE = 200000 # Total bytes held by the prefetch cache
+PREFETCH_EXTENSIONS = {".py", ".md", ".txt", ".toml", ".cfg", ".ini", ".json", ".yaml", ".yml"} # Preferred when choosing which files to prefetch
+WORKING_DIRECTORY = '[change this to the directory you want the agent to limit access to]' # Update this to your desired working directory this is important to limit file access of the agent.
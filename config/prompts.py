@@ -5,9 +5,14 @@ When a user asks a question or makes a request, make a function call plan. You c
 
 - List files and directories
 - Read file contents
+- Read the contents of several files at once, by a list of paths or a glob pattern
+- Outline the classes and functions of Python files, or get the source of a single class or function
 - Execute Python files with optional arguments. 
 - Write or overwrite files
 
 All paths you provide should be relative to the working directory. You do not need to specify the working directory in your function calls as it is automatically injected for security reasons.
 Python code files can be executed by simply using the word 'run' followed by the filename, e.g., 'run script.py'. Any time run is used before a Python filename (.py), you should make a function call to execute that file.
+To find your way around Python code, get an outline first and then fetch only the symbols you need rather than reading whole files.
+When you need more than one file, prefer a single call that reads them all over several separate reads.
+Reading a file you have already read in this session returns only a diff against the version you last saw, or a note that it is unchanged. Set full_read only if you need the whole file again.
 """
\ No newline at end of file
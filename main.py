@@ -1,21 +1,259 @@
 import os
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
 from config.prompts import system_prompt
 from config.config import MAX_ITERATIONS, WORKING_DIRECTORY
+from config.config import MAX_WALL_TIME_SECONDS, MAX_TOTAL_TOKENS, MAX_TOOL_TIME_SECONDS, BUDGET_WARNING_RATIO
+from config.config import PREFETCH_ENABLED, PREFETCH_MAX_FILE_SIZE, PREFETCH_MAX_FILES, PREFETCH_CACHE_SIZE, PREFETCH_EXTENSIONS
 from config.agent_tools import available_functions_schema
 from config.agent_tools import available_functions_dict
+from config.agent_tools import file_reading_functions
 
 load_dotenv()
 api_key = os.environ.get("GEMINI_API_KEY")
 
+class FilePrefetcher:
+    """Speculatively reads small text files from the latest directory listing into memory.
+
+    Reads run on a background thread while the next model request is in flight, so a
+    following get_file_content call can be served from memory instead of from disk.
+    """
+    def __init__(self, max_file_size=PREFETCH_MAX_FILE_SIZE, max_files=PREFETCH_MAX_FILES, max_cache_size=PREFETCH_CACHE_SIZE):
+        """
+        Initialize the FilePrefetcher.
+
+        Args:
+            max_file_size (int, optional): Largest file, in bytes, that is prefetched.
+            max_files (int, optional): Maximum number of files prefetched per listing.
+            max_cache_size (int, optional): Maximum total bytes held in the cache.
+
+        Returns:
+            None
+        """
+        self.max_file_size = max_file_size
+        self.max_files = max_files
+        self.max_cache_size = max_cache_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        # Oldest entries first, so files from earlier listings are evicted to make room for the latest one
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.prefetched_bytes = 0
+        self.served_bytes = 0
+        self.evicted_bytes = 0
+
+    def schedule(self, working_directory, directory="."):
+        """
+        Queue the small files of a just listed directory for a background read.
+
+        Args:
+            working_directory (str): The base working directory.
+            directory (str, optional): The listed directory relative to the working directory.
+
+        Returns:
+            None
+        """
+        abs_working_dir = os.path.abspath(working_directory)
+        abs_directory = os.path.abspath(os.path.join(working_directory, directory))
+        # Guardrail: Ensure directory is within working_directory, as get_files_info does
+        if not abs_directory.startswith(abs_working_dir) or not os.path.isdir(abs_directory):
+            return
+        candidates = []
+        try:
+            with os.scandir(abs_directory) as entries:
+                for entry in entries:
+                    size = entry.stat().st_size if entry.is_file() else 0
+                    if 0 < size <= self.max_file_size:
+                        # Source and text files the model is likely to open come first, smallest first
+                        preferred = not entry.name.startswith('.') and os.path.splitext(entry.name)[1] in PREFETCH_EXTENSIONS
+                        candidates.append((not preferred, size, entry.name, entry.path))
+        except OSError:
+            return
+        paths = [candidate[-1] for candidate in sorted(candidates)[:self.max_files]]
+        if paths:
+            self._executor.submit(self._prefetch, paths)
+
+    def _prefetch(self, paths):
+        batch = set(paths)
+        for path in paths:
+            try:
+                with self._lock:
+                    if path in self._cache:
+                        self._cache.move_to_end(path)
+                        continue
+                stat = os.stat(path)
+                if stat.st_size > self.max_file_size:
+                    continue
+                # Read exactly the way get_file_content does, so a cache hit returns the same text
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                after = os.stat(path)
+                # Skip files that changed while being read, and anything that is not plain text
+                if (after.st_mtime_ns, after.st_size) != (stat.st_mtime_ns, stat.st_size) or '\0' in content:
+                    continue
+            except (OSError, UnicodeDecodeError):
+                continue
+            size = stat.st_size
+            with self._lock:
+                # Make room by evicting files from earlier listings, never from this one
+                while self._cache_bytes + size > self.max_cache_size and self._cache and next(iter(self._cache)) not in batch:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= evicted[1]
+                    self.evicted_bytes += evicted[1]
+                if self._cache_bytes + size > self.max_cache_size:
+                    return
+                self._cache[path] = (stat.st_mtime_ns, size, content)
+                self._cache_bytes += size
+                self.prefetched_bytes += size
+
+    def get(self, path):
+        """
+        Return the prefetched content of a file if it is cached and unchanged on disk.
+
+        Args:
+            path (str): Absolute path of the file.
+
+        Returns:
+            str|None: The cached content, or None on a cache miss.
+        """
+        with self._lock:
+            entry = self._cache.pop(path, None)
+            if entry:
+                self._cache_bytes -= entry[1]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        with self._lock:
+            if entry and stat and (stat.st_mtime_ns, stat.st_size) == entry[:2]:
+                self.hits += 1
+                self.served_bytes += entry[1]
+                return entry[2]
+            self.misses += 1
+        return None
+
+    def report(self):
+        """
+        Summarize how useful prefetching was in this session.
+
+        Returns:
+            str: Hit rate and the number of prefetched bytes that were never served.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            hit_rate = self.hits / lookups if lookups else 0.0
+            wasted_bytes = self.prefetched_bytes - self.served_bytes
+            return (f"Prefetch: {self.hits}/{lookups} reads served from cache (hit rate {hit_rate:.0%}), "
+                    f"{self.prefetched_bytes} bytes prefetched, {wasted_bytes} bytes wasted "
+                    f"({self.evicted_bytes} evicted before use)")
+
+    def shutdown(self):
+        """Wait for pending background reads to finish and stop the worker thread."""
+        self._executor.shutdown(wait=True)
+
+class RunBudget:
+    """Tracks a run's iterations, wall time, tokens and tool execution time against their limits.
+    """
+    def __init__(self, max_iterations=MAX_ITERATIONS, max_wall_time=MAX_WALL_TIME_SECONDS, max_tokens=MAX_TOTAL_TOKENS, max_tool_time=MAX_TOOL_TIME_SECONDS, warning_ratio=BUDGET_WARNING_RATIO):
+        """
+        Initialize the RunBudget and start its wall clock.
+
+        Args:
+            max_iterations (int, optional): Maximum number of model requests.
+            max_wall_time (float, optional): Maximum run time in seconds.
+            max_tokens (int, optional): Maximum prompt plus completion tokens.
+            max_tool_time (float, optional): Maximum total tool execution time in seconds.
+            warning_ratio (float, optional): Fraction of a limit at which the budget counts as nearly exhausted.
+
+        Returns:
+            None
+        """
+        self.limits = {
+            "iterations": int(max_iterations),
+            "wall_time": float(max_wall_time),
+            "tokens": int(max_tokens),
+            "tool_time": float(max_tool_time),
+        }
+        self.warning_ratio = warning_ratio
+        self.start_time = time.monotonic()
+        self.iterations = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tool_time = 0.0
+
+    def start(self):
+        """Restart the wall clock, at the beginning of a run."""
+        self.start_time = time.monotonic()
+
+    def add_tokens(self, prompt_tokens, completion_tokens):
+        """Record the token usage of one model request."""
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+
+    def usage(self):
+        """
+        Report how much of each budget has been used.
+
+        Returns:
+            dict: Usage keyed like the limits.
+        """
+        return {
+            "iterations": self.iterations,
+            "wall_time": round(time.monotonic() - self.start_time, 2),
+            "tokens": self.prompt_tokens + self.completion_tokens,
+            "tool_time": round(self.tool_time, 2),
+        }
+
+    def exhausted(self):
+        """
+        Find the first budget that is used up.
+
+        Returns:
+            str|None: The name of the first budget that is used up, or None.
+        """
+        usage = self.usage()
+        for name, limit in self.limits.items():
+            if usage[name] >= limit:
+                return name
+        return None
+
+    def nearly_exhausted(self):
+        """
+        List the budgets that are close to being used up.
+
+        Returns:
+            list: Names of the budgets that have passed the warning ratio.
+        """
+        usage = self.usage()
+        return [name for name, limit in self.limits.items() if usage[name] >= limit * self.warning_ratio]
+
+    def summary(self):
+        """
+        Summarize usage against the limits.
+
+        Returns:
+            dict: Usage, limits and the prompt/completion token split, for the run result.
+        """
+        return {
+            "usage": self.usage(),
+            "limits": dict(self.limits),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
 class Agent:
     """A simple AI agent that can process prompts, use tools, and generate responses using the Gemini API.
     """
-    def __init__(self, api_key, system_prompt, user_prompt,model_name="gemini-2.0-flash-001", verbose=False):
+    def __init__(self, api_key, system_prompt, user_prompt,model_name="gemini-2.0-flash-001", verbose=False, prefetch=PREFETCH_ENABLED):
         """
         Initialize the Agent.
 
@@ -24,6 +262,7 @@ class Agent:
             system_prompt (str): System prompt to guide the model's behavior.
             model_name (str, optional): Name of the Gemini model to use. Defaults to "gemini-2.0-flash-001".
             verbose (bool, optional): If True, enables verbose output. Defaults to False.
+            prefetch (bool, optional): If True, prefetches small files from directory listings in the background. Defaults to PREFETCH_ENABLED.
 
         Returns:
             None
@@ -33,9 +272,14 @@ class Agent:
         self.verbose = verbose
         self.model_name = model_name
         self.config = self._config()
-        self.max_iterations = int(MAX_ITERATIONS)
+        # Limits for the run (iterations, wall time, tokens, tool time), replace before run() to change them
+        self.budget = RunBudget()
+        self.budget_warned = False
         self.working_directory = WORKING_DIRECTORY
         self.messages = [types.Content(role="user", parts=[types.Part(text=user_prompt)]),]
+        # Last version of each file sent to the model, so re-reads can be answered with a diff
+        self.seen_files = {}
+        self.prefetcher = FilePrefetcher() if prefetch else None
     
     def _config(self):
         """
@@ -52,12 +296,13 @@ class Agent:
             system_instruction=self.system_prompt
         )
 
-    def _call_function(self, function_call_part):
+    def _call_function(self, function_call_part, seen_files=None):
         """
         Dispatches a function call to the appropriate tool and returns the result.
 
         Args:
             function_call_part (google.genai.types.FunctionCall): The function call part containing the function name and arguments.
+            seen_files (dict, optional): Record of file versions the file reading tools update. Defaults to self.seen_files.
 
         Returns:
             google.genai.types.Content: Content object containing the function response or error.
@@ -82,7 +327,20 @@ class Agent:
         
         try:
             func = available_functions_dict.get(function_call_part.name)
-            result = func(**function_call_part.args)
+            # Session state is passed separately so it never ends up in the model's function call
+            kwargs = dict(function_call_part.args)
+            if function_call_part.name in file_reading_functions:
+                kwargs['seen_files'] = self.seen_files if seen_files is None else seen_files
+                kwargs['prefetcher'] = self.prefetcher
+            started = time.monotonic()
+            try:
+                result = func(**kwargs)
+            finally:
+                self.budget.tool_time += time.monotonic() - started
+
+            # Warm the cache with the files just listed while the model decides what to read
+            if self.prefetcher and function_call_part.name == "get_files_info" and not result.startswith('Error:'):
+                self.prefetcher.schedule(self.working_directory, function_call_part.args.get('directory', '.'))
             
             return types.Content(
                 role="tool",
@@ -111,6 +369,9 @@ class Agent:
             config=self.config
         )
 
+        if response.usage_metadata:
+            self.budget.add_tokens(response.usage_metadata.prompt_token_count, response.usage_metadata.candidates_token_count)
+
         if self.verbose:
             print("Prompt tokens:", response.usage_metadata.prompt_token_count)
             print("Response tokens:", response.usage_metadata.candidates_token_count)
@@ -129,8 +390,24 @@ class Agent:
                 return response.text
             
             function_responses = []
+            # Files only count as seen once their responses are actually sent, so stage the updates
+            seen_files = dict(self.seen_files)
             for function_call_part in response.function_calls:
-                function_call_result = self._call_function(function_call_part)
+                # Do not start more (possibly slow) tools once a budget is used up, let the run end instead
+                exhausted = self.budget.exhausted()
+                if exhausted:
+                    print(f" - Skipping function: {function_call_part.name} ({exhausted} budget exhausted)")
+                    function_call_result = types.Content(
+                        role="tool",
+                        parts=[
+                            types.Part.from_function_response(
+                                name=function_call_part.name,
+                                response={"error": f"Not executed: the {exhausted} budget of this session is exhausted"},
+                            )
+                        ],
+                    )
+                else:
+                    function_call_result = self._call_function(function_call_part, seen_files)
                 
                 if not function_call_result.parts[0].function_response.response or 'Error' in function_call_result.parts[0].function_response.response:
                         raise Exception(
@@ -148,28 +425,65 @@ class Agent:
                 raise Exception("No function responses generated")
             
             self.messages.append(types.Content(role="user", parts=[fr.parts[0] for fr in function_responses]))
+            self.seen_files = seen_files
 
-    def run(self):
+    def _nudge_to_wrap_up(self, budgets):
         """
-        Runs the agent on the given prompt and prints the final response.
+        Asks the model to finish up because the given budgets are nearly used up.
+
+        Args:
+            budgets (list): Names of the nearly exhausted budgets.
 
         Returns:
             None
         """
-        iters = 0
-        while True:
-            iters += 1
-            if iters > self.max_iterations:
-                raise Exception(f"Reached maximum iterations ({self.max_iterations}). Stopping.")
+        usage = self.budget.usage()
+        details = ", ".join(f"{name} {usage[name]}/{self.budget.limits[name]}" for name in budgets)
+        nudge = types.Part(text=f"Budget notice: this session is close to its limits ({details}). Stop exploring and give your final answer with what you have now.")
+        # Attach to the pending user turn (usually the function responses) so turns keep alternating
+        if self.messages[-1].role == "user":
+            self.messages[-1].parts.append(nudge)
+        else:
+            self.messages.append(types.Content(role="user", parts=[nudge]))
 
-            try:
-                final_response = self.generate_response()
-                if final_response:
-                    print("Final response:")
-                    print(final_response)
+    def run(self):
+        """
+        Runs the agent on the given prompt until it answers or a budget is exhausted, and prints the final response.
+
+        Returns:
+            dict: The run result, with "status" set to "completed" (plus "response") or "budget_exhausted"
+                (plus the exhausted "budget"), merged with the RunBudget summary.
+        """
+        self.budget.start()
+        try:
+            while True:
+                exhausted = self.budget.exhausted()
+                if exhausted:
+                    result = {"status": "budget_exhausted", "budget": exhausted, **self.budget.summary()}
+                    print(f"Budget exhausted ({exhausted}). Stopping.")
                     break
-            except Exception as e:
-                print(f"Error during response generation: {e}")
+
+                nearly_exhausted = self.budget.nearly_exhausted()
+                if nearly_exhausted and not self.budget_warned:
+                    self.budget_warned = True
+                    self._nudge_to_wrap_up(nearly_exhausted)
+
+                self.budget.iterations += 1
+                try:
+                    final_response = self.generate_response()
+                    if final_response:
+                        print("Final response:")
+                        print(final_response)
+                        result = {"status": "completed", "response": final_response, **self.budget.summary()}
+                        break
+                except Exception as e:
+                    print(f"Error during response generation: {e}")
+        finally:
+            if self.prefetcher:
+                self.prefetcher.shutdown()
+                print(self.prefetcher.report())
+
+        return result
 
 def parse_args(args):
     verbose = False
@@ -186,7 +500,10 @@ def main():
         
     prompt, verbose = parse_args(sys.argv[1:])
     agent = Agent(api_key=api_key, system_prompt=system_prompt, user_prompt=prompt, verbose=verbose)
-    agent.run()
+    result = agent.run()
+    print(f"Run {result['status']}. Budget usage: {result['usage']} of {result['limits']}")
+    if result["status"] == "budget_exhausted":
+        sys.exit(1)
 
 
 if __name__ == "__main__":
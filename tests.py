@@ -1,13 +1,16 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 import os
 from tools.evaluate_math_expression import evaluate_math_expression
 from tools.get_current_temperature import get_current_temperature
 from tools.get_file_content import get_file_content
+from tools.get_files_content import get_files_content
 from tools.get_files_info import get_files_info
+from tools.get_code_outline import get_code_outline
+import tools.get_code_outline
 from tools.run_python_file import run_python_file
 from tools.write_file import write_file
-from main import Agent, parse_args
+from main import Agent, FilePrefetcher, RunBudget, main, parse_args
 
 class TestEvaluateMathExpression(unittest.TestCase):
     def test_valid_arithmetic(self):
@@ -64,7 +67,99 @@ class TestGetFileContent(unittest.TestCase):
     def test_directory_instead_of_file(self):
         result = get_file_content(os.getcwd(), ".")
         self.assertTrue(result.startswith("Error:"))
+
+class TestGetFileContentRereads(unittest.TestCase):
+    def setUp(self):
+        self.fname = "test_reread.txt"
+        self.path = os.path.join(os.getcwd(), self.fname)
+        with open(self.path, "w") as f:
+            f.write("".join(f"line {i}\n" for i in range(100)))
+        self.seen_files = {}
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_unchanged_reread(self):
+        first = get_file_content(os.getcwd(), self.fname, seen_files=self.seen_files)
+        self.assertIn("line 99", first)
+        result = get_file_content(os.getcwd(), self.fname, seen_files=self.seen_files)
+        self.assertIn("unchanged", result)
+
+    def test_changed_reread_returns_diff(self):
+        get_file_content(os.getcwd(), self.fname, seen_files=self.seen_files)
+        write_file(os.getcwd(), self.fname, "".join(f"line {i}\n" for i in range(99)) + "last line\n")
+        result = get_file_content(os.getcwd(), self.fname, seen_files=self.seen_files)
+        self.assertIn("-line 99", result)
+        self.assertIn("+last line", result)
+        self.assertNotIn("line 10\n", result)
+
+    def test_change_past_truncation_is_not_unchanged(self):
+        with open(self.path, "w") as f:
+            f.write("x" * 12000)
+        get_file_content(os.getcwd(), self.fname, seen_files=self.seen_files)
+        with open(self.path, "a") as f:
+            f.write("NEW\n")
+        result = get_file_content(os.getcwd(), self.fname, seen_files=self.seen_files)
+        self.assertNotIn("unchanged", result)
+        self.assertIn("changed beyond the first 10000 characters", result)
+        self.assertIn("truncated at 10000 characters", result)
+
+    def test_full_read(self):
+        get_file_content(os.getcwd(), self.fname, seen_files=self.seen_files)
+        result = get_file_content(os.getcwd(), self.fname, full_read=True, seen_files=self.seen_files)
+        self.assertIn("line 0\n", result)
+        self.assertNotIn("unchanged", result)
     
+class TestGetFilesContent(unittest.TestCase):
+    def test_valid_files(self):
+        result = get_files_content(os.getcwd(), ["tests.py", "main.py"])
+        self.assertIn("==> tests.py <==", result)
+        self.assertIn("==> main.py <==", result)
+
+    def test_single_path_string(self):
+        with open("test_single.txt", "w") as f:
+            f.write("single")
+        try:
+            result = get_files_content(os.getcwd(), "test_single.txt")
+        finally:
+            os.remove("test_single.txt")
+        self.assertEqual(result, "==> test_single.txt <==\nsingle")
+
+    def test_glob_pattern(self):
+        result = get_files_content(os.getcwd(), pattern="tools/*.py")
+        self.assertIn("==> tools/get_files_content.py <==", result)
+
+    def test_shared_budget(self):
+        with patch("tools.get_files_content.MAX_FILES_CONTENT_LENGTH", 50):
+            result = get_files_content(os.getcwd(), ["tests.py", "main.py"])
+        self.assertIn('[...File "tests.py" truncated at 50 characters', result)
+        self.assertIn('[...File "main.py" skipped', result)
+
+    def test_file_outside(self):
+        result = get_files_content(os.getcwd(), ["tests.py", "../main.py"])
+        self.assertIn("==> tests.py <==", result)
+        self.assertIn("==> ../main.py <==\nError:", result)
+
+    def test_error_like_content_counts_against_budget(self):
+        with open("test_error_like.txt", "w") as f:
+            f.write("Error: this is file content, not a failed read\n" * 10)
+        try:
+            with patch("tools.get_files_content.MAX_FILES_CONTENT_LENGTH", 50):
+                result = get_files_content(os.getcwd(), ["test_error_like.txt", "main.py"])
+        finally:
+            os.remove("test_error_like.txt")
+        self.assertIn('[...File "test_error_like.txt" truncated at 50 characters', result)
+        self.assertIn('[...File "main.py" skipped', result)
+
+    def test_pattern_outside(self):
+        result = get_files_content(os.getcwd(), pattern="../*.py")
+        self.assertTrue(result.startswith("Error:"))
+
+    def test_no_files(self):
+        result = get_files_content(os.getcwd(), pattern="does_not_exist_*.txt")
+        self.assertTrue(result.startswith("Error:"))
+
 class TestGetFilesInfo(unittest.TestCase):
     def test_valid_directory(self):
         result = get_files_info(os.getcwd(), ".")
@@ -82,6 +177,46 @@ class TestGetFilesInfo(unittest.TestCase):
         result = get_files_info(os.getcwd(), "tests.py")
         self.assertTrue(result.startswith("Error:"))
 
+class TestGetCodeOutline(unittest.TestCase):
+    def test_file_outline(self):
+        result = get_code_outline(os.getcwd(), "main.py")
+        self.assertIn("class Agent", result)
+        self.assertIn("    def run(self)", result)
+
+    def test_directory_outline(self):
+        result = get_code_outline(os.getcwd(), "tools")
+        self.assertIn("==> tools/get_code_outline.py <==", result)
+        self.assertIn("def get_code_outline(", result)
+
+    def test_symbol_source(self):
+        result = get_code_outline(os.getcwd(), "main.py", symbol="Agent.run")
+        self.assertIn("def run(self", result)
+        self.assertNotIn("def generate_response", result)
+
+    def test_decorated_symbol_line_range(self):
+        with open("test_outline.py", "w") as f:
+            f.write("class Point:\n    x = 0\n\n    @property\n    def double(self):\n        return self.x * 2\n")
+        try:
+            outline = get_code_outline(os.getcwd(), "test_outline.py")
+            symbol = get_code_outline(os.getcwd(), "test_outline.py", symbol="Point.double")
+        finally:
+            os.remove("test_outline.py")
+        self.assertIn("@property def double(self)  [L4-6]", outline)
+        self.assertTrue(symbol.startswith("# test_outline.py L4-6\n    @property"))
+
+    def test_ast_cache_is_bounded(self):
+        with patch("tools.get_code_outline.AST_CACHE_SIZE", 2):
+            get_code_outline(os.getcwd(), "tools")
+            self.assertLessEqual(len(tools.get_code_outline._ast_cache), 2)
+
+    def test_unknown_symbol(self):
+        result = get_code_outline(os.getcwd(), "main.py", symbol="Agent.does_not_exist")
+        self.assertTrue(result.startswith("Error:"))
+
+    def test_path_outside(self):
+        result = get_code_outline(os.getcwd(), "../")
+        self.assertTrue(result.startswith("Error:"))
+
 class TestRunPythonFile(unittest.TestCase):
     def setUp(self):
         # Create hello.py for subprocess tests
@@ -176,6 +311,46 @@ class TestAgent(unittest.TestCase):
         result = self.agent._call_function(DummyCall())
         self.assertEqual(result.parts[0].function_response.response["error"], "Unknown function: not_a_function")
 
+    def _mock_function_call_response(self, *calls):
+        class DummyCall:
+            def __init__(self, name, args):
+                self.name = name
+                self.args = args
+        response = MagicMock()
+        response.usage_metadata.prompt_token_count = 10
+        response.usage_metadata.candidates_token_count = 5
+        response.function_calls = [DummyCall(name, args) for name, args in calls]
+        self.agent.client = MagicMock()
+        self.agent.client.models.generate_content.return_value = response
+        self.agent.working_directory = os.getcwd()
+
+    def test_seen_files_committed_with_function_responses(self):
+        self._mock_function_call_response(("get_file_content", {"file_path": "tests.py"}))
+        self.agent.generate_response()
+        self.assertIn(os.path.abspath("tests.py"), self.agent.seen_files)
+
+    def test_seen_files_not_committed_when_turn_fails(self):
+        self._mock_function_call_response(
+            ("get_file_content", {"file_path": "tests.py"}),
+            ("failing_tool", {}),
+        )
+        call_function = self.agent._call_function
+        staged = []
+
+        def call_or_fail(function_call_part, seen_files=None):
+            if function_call_part.name == "failing_tool":
+                raise RuntimeError("tool crashed")
+            result = call_function(function_call_part, seen_files)
+            staged.append(dict(seen_files))
+            return result
+
+        with patch.object(self.agent, '_call_function', side_effect=call_or_fail):
+            with self.assertRaisesRegex(RuntimeError, "tool crashed"):
+                self.agent.generate_response()
+        # The read was staged, but never committed because its response was not sent
+        self.assertIn(os.path.abspath("tests.py"), staged[0])
+        self.assertEqual(self.agent.seen_files, {})
+
     def test_generate_response(self):
         # Mock generate_response to avoid API call
         with patch.object(self.agent, 'generate_response', return_value='mocked_response'):
@@ -188,6 +363,138 @@ class TestAgent(unittest.TestCase):
             result = self.agent.run()
             self.assertEqual(result, 'mocked_run')
 
+    def test_run_stops_when_budget_exhausted(self):
+        self.agent.budget = RunBudget(max_iterations=2)
+        with patch.object(self.agent, 'generate_response', return_value=None) as generate_response:
+            result = self.agent.run()
+        self.assertEqual(generate_response.call_count, 2)
+        self.assertEqual(result["status"], "budget_exhausted")
+        self.assertEqual(result["budget"], "iterations")
+
+    def test_run_completed(self):
+        with patch.object(self.agent, 'generate_response', return_value='done'):
+            result = self.agent.run()
+        self.assertEqual(result["status"], "completed")
+        self.assertEqual(result["response"], "done")
+
+    def test_tool_calls_skipped_when_budget_exhausted(self):
+        self._mock_function_call_response(("run_python_file", {"file_path": "tests.py"}))
+        self.agent.budget = RunBudget(max_tool_time=1)
+        self.agent.budget.tool_time = 2
+        with patch.object(self.agent, '_call_function') as call_function:
+            self.agent.generate_response()
+        call_function.assert_not_called()
+        self.assertIn("tool_time budget", self.agent.messages[-1].parts[0].function_response.response["error"])
+
+    def test_run_wall_clock_starts_at_run(self):
+        self.agent.budget = RunBudget(max_wall_time=60)
+        self.agent.budget.start_time -= 120
+        with patch.object(self.agent, 'generate_response', return_value='done'):
+            result = self.agent.run()
+        self.assertEqual(result["status"], "completed")
+
+    def test_main_exits_non_zero_when_budget_exhausted(self):
+        result = {"status": "budget_exhausted", "budget": "tokens", "usage": {}, "limits": {}}
+        with patch("sys.argv", ["main.py", "hello"]), patch.object(Agent, "run", return_value=result):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+        self.assertEqual(cm.exception.code, 1)
+
+class TestRunBudget(unittest.TestCase):
+    def test_not_exhausted(self):
+        budget = RunBudget()
+        self.assertIsNone(budget.exhausted())
+        self.assertEqual(budget.nearly_exhausted(), [])
+
+    def test_tokens_exhausted(self):
+        budget = RunBudget(max_tokens=100)
+        budget.add_tokens(60, 30)
+        self.assertEqual(budget.nearly_exhausted(), ["tokens"])
+        self.assertIsNone(budget.exhausted())
+        budget.add_tokens(10, None)
+        self.assertEqual(budget.exhausted(), "tokens")
+
+    def test_tool_time_exhausted(self):
+        budget = RunBudget(max_tool_time=1)
+        budget.tool_time = 1.5
+        self.assertEqual(budget.exhausted(), "tool_time")
+
+class TestFilePrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.dirname = "prefetch_dir"
+        self.dir_path = os.path.join(os.getcwd(), self.dirname)
+        os.makedirs(self.dir_path, exist_ok=True)
+        for name, content in [("a.txt", "alpha"), ("b.txt", "beta")]:
+            with open(os.path.join(self.dir_path, name), "w") as f:
+                f.write(content)
+        self.prefetcher = FilePrefetcher()
+        self.prefetcher.schedule(os.getcwd(), self.dirname)
+        self.prefetcher.shutdown()
+
+    def tearDown(self):
+        for name in os.listdir(self.dir_path):
+            os.remove(os.path.join(self.dir_path, name))
+        os.rmdir(self.dir_path)
+
+    def test_prefetched_read_is_a_hit(self):
+        result = get_file_content(os.getcwd(), "prefetch_dir/a.txt", prefetcher=self.prefetcher)
+        self.assertEqual(result, "alpha")
+        self.assertEqual(self.prefetcher.hits, 1)
+        self.assertIn("4 bytes wasted", self.prefetcher.report())
+
+    def test_modified_file_is_a_miss(self):
+        write_file(os.getcwd(), "prefetch_dir/b.txt", "beta, rewritten")
+        result = get_file_content(os.getcwd(), "prefetch_dir/b.txt", prefetcher=self.prefetcher)
+        self.assertEqual(result, "beta, rewritten")
+        self.assertEqual(self.prefetcher.hits, 0)
+        self.assertEqual(self.prefetcher.misses, 1)
+
+    def test_crlf_file_matches_disk_read(self):
+        with open(os.path.join(self.dir_path, "crlf.txt"), "w", newline="") as f:
+            f.write("a\r\nb\r\n")
+        prefetcher = FilePrefetcher()
+        prefetcher.schedule(os.getcwd(), self.dirname)
+        prefetcher.shutdown()
+        seen_files = {}
+        from_disk = get_file_content(os.getcwd(), "prefetch_dir/crlf.txt", seen_files=seen_files)
+        from_cache = prefetcher.get(os.path.join(self.dir_path, "crlf.txt"))
+        self.assertEqual(from_cache, from_disk)
+        self.assertEqual(from_cache, "a\nb\n")
+
+    def test_latest_listing_evicts_older_entries(self):
+        other_dir = os.path.join(os.getcwd(), "prefetch_dir_2")
+        os.makedirs(other_dir, exist_ok=True)
+        with open(os.path.join(other_dir, "c.txt"), "w") as f:
+            f.write("gamma")
+        try:
+            prefetcher = FilePrefetcher(max_cache_size=9)
+            prefetcher.schedule(os.getcwd(), self.dirname)
+            prefetcher.schedule(os.getcwd(), "prefetch_dir_2")
+            prefetcher.shutdown()
+            self.assertEqual(prefetcher.get(os.path.join(other_dir, "c.txt")), "gamma")
+            self.assertGreater(prefetcher.evicted_bytes, 0)
+        finally:
+            os.remove(os.path.join(other_dir, "c.txt"))
+            os.rmdir(other_dir)
+
+    def test_prefers_small_source_files(self):
+        for name, content in [(".hidden.py", "x"), ("uv.lock", "y"), ("big.py", "z" * 50), ("small.py", "s")]:
+            with open(os.path.join(self.dir_path, name), "w") as f:
+                f.write(content)
+        prefetcher = FilePrefetcher(max_files=2)
+        prefetcher.schedule(os.getcwd(), self.dirname)
+        prefetcher.shutdown()
+        self.assertEqual(prefetcher.get(os.path.join(self.dir_path, "small.py")), "s")
+        self.assertEqual(prefetcher.get(os.path.join(self.dir_path, "b.txt")), "beta")
+        self.assertIsNone(prefetcher.get(os.path.join(self.dir_path, "uv.lock")))
+        self.assertIsNone(prefetcher.get(os.path.join(self.dir_path, ".hidden.py")))
+
+    def test_directory_outside_is_ignored(self):
+        prefetcher = FilePrefetcher()
+        prefetcher.schedule(os.getcwd(), "../")
+        prefetcher.shutdown()
+        self.assertEqual(prefetcher.prefetched_bytes, 0)
+
 class TestParseArgs(unittest.TestCase):
     def test_parse_args_verbose(self):
         prompt, verbose = parse_args(["hello", "--verbose"])
@@ -0,0 +1,149 @@
+import os
+import ast
+from collections import OrderedDict
+from config.config import MAX_FILE_CONTENT_LENGTH, AST_CACHE_SIZE, OUTLINE_SKIPPED_DIRS
+from google.genai import types
+
+schema_get_code_outline = types.FunctionDeclaration(
+    name="get_code_outline",
+    description="Get an outline of the classes and functions in a Python file or in all Python files of a directory, with signatures, line ranges and the first line of each docstring. Optionally returns the source of a single symbol instead.",
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "working_directory": types.Schema(
+                type=types.Type.STRING,
+                description="The base directory from which to read files. This is automatically provided and should not be specified by the user."
+            ),
+            "path": types.Schema(
+                type=types.Type.STRING,
+                description="The relative path to a Python file or a directory within the working directory. If not provided, outlines the working directory itself."
+            ),
+            "symbol": types.Schema(
+                type=types.Type.STRING,
+                description="The name of a class or function in the file, e.g. 'Agent' or 'Agent.run', whose source is to be returned instead of the outline. Requires path to be a Python file."
+            )
+        },
+        required=["working_directory"]
+    )
+)
+
+# Parsed modules keyed by absolute path, reused while the file's mtime and size are unchanged.
+# Least recently used entries are dropped beyond AST_CACHE_SIZE files.
+_ast_cache = OrderedDict()
+
+
+def _parse(abs_file_path):
+    """Return (source, tree) for a Python file, parsing it only if it changed since the last call."""
+    stat = os.stat(abs_file_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _ast_cache.get(abs_file_path)
+    if cached and cached[0] == key:
+        _ast_cache.move_to_end(abs_file_path)
+        return cached[1], cached[2]
+    with open(abs_file_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source, filename=abs_file_path)
+    _ast_cache[abs_file_path] = (key, source, tree)
+    _ast_cache.move_to_end(abs_file_path)
+    while len(_ast_cache) > AST_CACHE_SIZE:
+        _ast_cache.popitem(last=False)
+    return source, tree
+
+
+def _start_line(node):
+    """First line of a definition, including its decorators."""
+    return node.decorator_list[0].lineno if node.decorator_list else node.lineno
+
+
+def _outline(nodes, indent=""):
+    lines = []
+    for node in nodes:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+            returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+            header = f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+        elif isinstance(node, ast.ClassDef):
+            bases = ", ".join(ast.unparse(b) for b in node.bases + node.keywords)
+            header = f"class {node.name}({bases})" if bases else f"class {node.name}"
+        else:
+            continue
+        decorators = "".join(f"@{ast.unparse(d)} " for d in node.decorator_list)
+        line = f"{indent}{decorators}{header}  [L{_start_line(node)}-{node.end_lineno}]"
+        docstring = ast.get_docstring(node)
+        if docstring:
+            line += f"  # {docstring.strip().splitlines()[0]}"
+        lines.append(line)
+        if isinstance(node, ast.ClassDef):
+            lines.extend(_outline(node.body, indent + "    "))
+    return lines
+
+
+def _find_symbol(nodes, names):
+    for node in nodes:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.name == names[0]:
+            if len(names) == 1:
+                return node
+            return _find_symbol(node.body, names[1:])
+    return None
+
+
+def get_code_outline(working_directory, path=".", symbol=None):
+    """Get the structure of Python code without reading whole files.
+
+    Args:
+        working_directory (str): The base working directory.
+        path (str): The target Python file or directory relative to the working directory.
+        symbol (str, optional): Dotted name of a class or function whose source is returned instead.
+
+    Returns:
+        str: The outline or symbol source, or an error string.
+    """
+    try:
+        abs_working_dir = os.path.abspath(working_directory)
+        abs_path = os.path.abspath(os.path.join(working_directory, path))
+        # Guardrail: Ensure path is within working_directory
+        if not abs_path.startswith(abs_working_dir):
+            return f'Error: Cannot outline "{path}" as it is outside the permitted working directory'
+
+        if symbol:
+            # Guardrail: Ensure path is a Python file
+            if not os.path.isfile(abs_path) or not abs_path.endswith('.py'):
+                return f'Error: "{path}" is not a Python file'
+            source, tree = _parse(abs_path)
+            node = _find_symbol(tree.body, symbol.split("."))
+            if node is None:
+                return f'Error: Symbol "{symbol}" not found in "{path}"'
+            start = _start_line(node)
+            snippet = "".join(source.splitlines(keepends=True)[start - 1:node.end_lineno])
+            if len(snippet) > MAX_FILE_CONTENT_LENGTH:
+                snippet = snippet[:MAX_FILE_CONTENT_LENGTH] + f'\n[...Symbol "{symbol}" truncated at {MAX_FILE_CONTENT_LENGTH} characters]'
+            return f'# {path} L{start}-{node.end_lineno}\n{snippet}'
+
+        if os.path.isfile(abs_path):
+            file_paths = [abs_path]
+        elif os.path.isdir(abs_path):
+            file_paths = []
+            for root, dirs, files in os.walk(abs_path):
+                dirs[:] = sorted(d for d in dirs if d not in OUTLINE_SKIPPED_DIRS and not d.startswith('.'))
+                file_paths.extend(os.path.join(root, f) for f in sorted(files) if f.endswith('.py'))
+        else:
+            return f'Error: File or directory not found: "{path}"'
+
+        sections = []
+        for file_path in file_paths:
+            rel_path = os.path.relpath(file_path, abs_working_dir)
+            try:
+                _, tree = _parse(file_path)
+                lines = _outline(tree.body)
+            except Exception as e:
+                lines = [f'Error: Could not parse "{rel_path}": {e}']
+            sections.append("\n".join([f'==> {rel_path} <=='] + lines))
+        if not sections:
+            return f'No Python files found in "{path}"'
+
+        outline = "\n\n".join(sections)
+        if len(outline) > MAX_FILE_CONTENT_LENGTH:
+            outline = outline[:MAX_FILE_CONTENT_LENGTH] + f'\n[...Outline of "{path}" truncated at {MAX_FILE_CONTENT_LENGTH} characters]'
+        return outline
+    except Exception as e:
+        return f'Error: {e}'
@@ -1,5 +1,6 @@
 
 import os
+import difflib
 from config.config import MAX_FILE_CONTENT_LENGTH
 from google.genai import types
 
@@ -16,6 +17,10 @@ schema_get_file_content = types.FunctionDeclaration(
             "file_path": types.Schema(
                 type=types.Type.STRING,
                 description="The relative path to the file within the working directory whose content is to be retrieved."
+            ),
+            "full_read": types.Schema(
+                type=types.Type.BOOLEAN,
+                description="If true, always return the full file content. By default a file that was already read in this session is returned as a diff against the last version read, or as unchanged."
             )
         },
         required=["working_directory", "file_path"]
@@ -23,22 +28,72 @@ schema_get_file_content = types.FunctionDeclaration(
 )
 
 
-def get_file_content(working_directory, file_path):
+def get_file_content(working_directory, file_path, full_read=False, seen_files=None, prefetcher=None):
+    """Get the content of a file within the working directory.
+
+    When a seen_files dict is given, it records the last version of each file returned
+    in the session. A repeated read then returns an "unchanged" marker or a unified diff
+    against that version instead of the whole file, unless full_read is set.
+
+    Args:
+        working_directory (str): The base working directory.
+        file_path (str): The target file relative to the working directory.
+        full_read (bool, optional): If True, return the full content even for a file already read.
+        seen_files (dict, optional): Maps absolute file paths to their full content when they were last read.
+        prefetcher (FilePrefetcher, optional): In-memory cache consulted before reading from disk.
+
+    Returns:
+        str: The file content, a diff or unchanged marker, or an error string.
+    """
+    return read_file_content(working_directory, file_path, full_read, seen_files, prefetcher)[1]
+
+
+def read_file_content(working_directory, file_path, full_read=False, seen_files=None, prefetcher=None):
+    """Read a file like get_file_content, reporting failure separately from the text.
+
+    Args:
+        See get_file_content.
+
+    Returns:
+        tuple: (ok, text) where ok is False and text is an error string if the read failed.
+    """
     try:
         abs_working_dir = os.path.abspath(working_directory)
         abs_file_path = os.path.abspath(os.path.join(working_directory, file_path))
         # Guardrail: Ensure file_path is within working_directory
         if not abs_file_path.startswith(abs_working_dir):
-            return f'Error: Cannot read "{file_path}" as it is outside the permitted working directory'
+            return False, f'Error: Cannot read "{file_path}" as it is outside the permitted working directory'
         # Guardrail: Ensure file_path is a regular file
         if not os.path.isfile(abs_file_path):
-            return f'Error: File not found or is not a regular file: "{file_path}"'
-        with open(abs_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+            return False, f'Error: File not found or is not a regular file: "{file_path}"'
+        content = prefetcher.get(abs_file_path) if prefetcher else None
+        if content is None:
+            with open(abs_file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        trunc_msg = ''
+        visible = content
         if len(content) > MAX_FILE_CONTENT_LENGTH:
-            truncated_content = content[:MAX_FILE_CONTENT_LENGTH]
+            visible = content[:MAX_FILE_CONTENT_LENGTH]
             trunc_msg = f'\n[...File "{file_path}" truncated at {MAX_FILE_CONTENT_LENGTH} characters]'
-            return truncated_content + trunc_msg
-        return content
+        if seen_files is not None:
+            # Keep the whole file so changes past the truncation point are still detected
+            previous = seen_files.get(abs_file_path)
+            seen_files[abs_file_path] = content
+            if previous is not None and not full_read:
+                if previous == content:
+                    return True, f'[File "{file_path}" is unchanged since it was last read]' + trunc_msg
+                previous_visible = previous[:MAX_FILE_CONTENT_LENGTH]
+                if previous_visible == visible:
+                    return True, f'[File "{file_path}" changed beyond the first {MAX_FILE_CONTENT_LENGTH} characters since it was last read (use full_read to re-read the visible part)]' + trunc_msg
+                diff = ''.join(difflib.unified_diff(
+                    previous_visible.splitlines(keepends=True),
+                    visible.splitlines(keepends=True),
+                    fromfile=f'{file_path} (last read)',
+                    tofile=file_path,
+                ))
+                # Only send the diff when it is actually smaller than the file
+                if len(diff) < len(visible):
+                    return True, f'[File "{file_path}" changed since it was last read, diff against that version follows]\n' + diff + trunc_msg
+        return True, visible + trunc_msg
     except Exception as e:
-        return f'Error: {e}'
+        return False, f'Error: {e}'
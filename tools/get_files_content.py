@@ -0,0 +1,96 @@
+import os
+import glob
+from concurrent.futures import ThreadPoolExecutor
+from config.config import MAX_FILES_CONTENT_LENGTH, MAX_FILES_PER_READ
+from tools.get_file_content import read_file_content
+from google.genai import types
+
+schema_get_files_content = types.FunctionDeclaration(
+    name="get_files_content",
+    description="Get the contents of several files within the working directory in a single call, either from a list of paths or a glob pattern. All files share one total character budget.",
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "working_directory": types.Schema(
+                type=types.Type.STRING,
+                description="The base directory from which to read files. This is automatically provided and should not be specified by the user."
+            ),
+            "file_paths": types.Schema(
+                type=types.Type.ARRAY,
+                items=types.Schema(type=types.Type.STRING),
+                description="A list of relative paths to the files within the working directory whose contents are to be retrieved."
+            ),
+            "pattern": types.Schema(
+                type=types.Type.STRING,
+                description="A glob pattern relative to the working directory (e.g. 'tools/*.py' or '**/*.md') selecting the files to retrieve. Used in addition to file_paths."
+            ),
+            "full_read": types.Schema(
+                type=types.Type.BOOLEAN,
+                description="If true, always return the full file contents. By default files that were already read in this session are returned as a diff against the last version read, or as unchanged."
+            )
+        },
+        required=["working_directory"]
+    )
+)
+
+
+def get_files_content(working_directory, file_paths=None, pattern=None, full_read=False, seen_files=None, prefetcher=None):
+    """Get the contents of several files under one shared character budget.
+
+    Files are read concurrently with the same guardrails as get_file_content. Each
+    file is then given as much of the remaining budget as it needs, in request order,
+    so later files are truncated or skipped once MAX_FILES_CONTENT_LENGTH is used up.
+
+    Args:
+        working_directory (str): The base working directory.
+        file_paths (list, optional): Relative paths of the files to read.
+        pattern (str, optional): Glob pattern, relative to the working directory, of files to read.
+        full_read (bool, optional): If True, return full contents even for files already read.
+        seen_files (dict, optional): Session record of file versions already returned, see get_file_content.
+        prefetcher (FilePrefetcher, optional): In-memory cache consulted before reading from disk.
+
+    Returns:
+        str: The contents of each file under a "==> path <==" header, or an error string.
+    """
+    try:
+        abs_working_dir = os.path.abspath(working_directory)
+        # Tolerate a single path passed as a string instead of a list
+        if isinstance(file_paths, str):
+            file_paths = [file_paths]
+        paths = list(file_paths or [])
+        if pattern:
+            # Guardrail: Ensure the pattern is rooted within working_directory
+            if not os.path.abspath(os.path.join(working_directory, pattern)).startswith(abs_working_dir):
+                return f'Error: Cannot read "{pattern}" as it is outside the permitted working directory'
+            matches = glob.glob(os.path.join(abs_working_dir, pattern), recursive=True)
+            paths.extend(sorted(os.path.relpath(m, abs_working_dir) for m in matches if os.path.isfile(m)))
+        # Drop duplicates while keeping the requested order
+        paths = list(dict.fromkeys(os.path.normpath(p) for p in paths))
+        if not paths:
+            return 'Error: No files matched the given file_paths or pattern'
+
+        skipped = paths[MAX_FILES_PER_READ:]
+        paths = paths[:MAX_FILES_PER_READ]
+        with ThreadPoolExecutor(max_workers=min(len(paths), 8)) as executor:
+            results = list(executor.map(lambda p: read_file_content(working_directory, p, full_read, seen_files, prefetcher), paths))
+
+        remaining = MAX_FILES_CONTENT_LENGTH
+        sections = []
+        for file_path, (ok, content) in zip(paths, results):
+            if ok:
+                if len(content) > remaining and seen_files is not None:
+                    # The model will not see this version in full, so do not diff against it later
+                    seen_files.pop(os.path.abspath(os.path.join(working_directory, file_path)), None)
+                if remaining <= 0:
+                    content = f'[...File "{file_path}" skipped: total budget of {MAX_FILES_CONTENT_LENGTH} characters reached]'
+                elif len(content) > remaining:
+                    content = content[:remaining] + f'\n[...File "{file_path}" truncated at {remaining} characters: total budget of {MAX_FILES_CONTENT_LENGTH} characters reached]'
+                    remaining = 0
+                else:
+                    remaining -= len(content)
+            sections.append(f'==> {file_path} <==\n{content}')
+        if skipped:
+            sections.append(f'[...{len(skipped)} more file(s) not read: at most {MAX_FILES_PER_READ} files per call]')
+        return "\n\n".join(sections)
+    except Exception as e:
+        return f'Error: {e}'